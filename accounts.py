@@ -2,9 +2,10 @@
     Module name :- accounts
     Method(s) :- previous_balance(filename), credit_amount(amount),
     debit(amount), transaction(amount, category, desc, mode_of_payment, credit=False),
-    ledger(date, amount, category, desc, mode_of_payment),
-    generate_csv_file(in_file, out_file, *keys), generate_category_report(),
-    generate_payment_report(), print_report(), generate_txt_file(output),
+    ledger(date, amount, category, desc, mode_of_payment), commit(), close(),
+    generate_csv_file(in_file, out_file, *keys, rows=None),
+    generate_category_report(rows=None), generate_payment_report(rows=None),
+    print_report(rows=None), read_ledger(), generate_txt_file(output),
     generate_html_file(output), generate_random_data()
     Classes:- Account.
 """
@@ -12,7 +13,144 @@
 import random
 import csv
 import datetime
+import io
 import os
+import sys
+from collections import defaultdict
+
+LEDGER_FIELDS = ["date", "category", "desc", "mode_of_payment", "amount"]
+BUFFER_SIZE = 1 << 20
+
+HTML_HEAD = (
+    "<!doctype html><html><head><style>"
+    "table,th,td{margin:auto;padding:5px;border:2px solid black;"
+    "border-collapse:collapse}"
+    "</style></head><body>"
+)
+HTML_TAIL = "</body></html>"
+
+
+def _open_ledger(filename):
+    """
+    Open a ledger file for appending, writing the header if it is empty.
+
+    Args:-
+        filename(str) :- Name of ledger file.
+
+    Return
+        Opened ledger file.
+    """
+    ledger_file = open(
+        filename, "a", encoding="utf-8", newline="", buffering=BUFFER_SIZE
+    )
+    if ledger_file.tell() == 0:
+        csv.writer(ledger_file).writerow(LEDGER_FIELDS)
+    return ledger_file
+
+
+def _csv_field(value):
+    """
+    Quote a value for a csv file only when it needs quoting.
+
+    Args:-
+        value(str) :- Value of field.
+
+    Return
+        Field as written to the csv file.
+    """
+    value = str(value)
+    if "," in value or '"' in value or "\n" in value or "\r" in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def _ledger_line(date, category, desc, mode_of_payment, amount):
+    """
+    Format a transaction record as a line of ledger file.
+
+    Args:-
+        date(datetime.date) :- Date of transaction.
+        category(str) :- Category.
+        desc(str) :- Description of transaction.
+        mode_of_payment(str) :- Mode of payment.
+        amount(float) :- Amount.
+
+    Return
+        Csv line for the record.
+    """
+    return (
+        f"{date},{_csv_field(category)},{_csv_field(desc)},"
+        f"{_csv_field(mode_of_payment)},{amount}\r\n"
+    )
+
+
+def _last_record(data):
+    """
+    Find the last complete csv record in the tail of a file.
+
+    Args:-
+        data(bytes) :- Tail of csv file.
+
+    Return
+        Bytes of the last record, or None if it may start before data.
+    """
+    data = data.rstrip(b"\r\n")
+    end = len(data)
+
+    # A line break ends a record only if the quotes after it are balanced,
+    # otherwise it is inside a quoted field.
+    while True:
+        end = data.rfind(b"\n", 0, end)
+        if end == -1:
+            return None
+        if data.count(b'"', end + 1) % 2 == 0:
+            return data[end + 1 :]
+
+
+def _sum_amounts(rows):
+    """
+    Sum ledger amounts by category and month in one pass over csv rows.
+
+    Args:-
+        rows(iterable) :- Csv rows of ledger starting with the header row.
+
+    Return
+        Totals keyed by (category, month number), where the month number
+        is year * 12 + month - 1.
+    """
+    rows = iter(rows)
+    header = next(rows)
+    date_index = header.index("date")
+    amount_index = header.index("amount")
+    category_index = header.index("category")
+
+    totals = defaultdict(float)
+    for row in rows:
+        year, month, _ = row[date_index].split("-")
+        key = (row[category_index], int(year) * 12 + int(month) - 1)
+        totals[key] += float(row[amount_index])
+
+    return totals
+
+
+def _select_columns(rows, keys):
+    """
+    Pick the given columns out of csv rows.
+
+    Args:-
+        rows(iterable) :- Csv rows starting with the header row.
+        keys(list) :- List of keys.
+
+    Return
+        Generator of header and rows holding only the given columns.
+    """
+    rows = iter(rows)
+    header = next(rows)
+    indices = [header.index(key) for key in keys]
+
+    yield list(keys)
+    for row in rows:
+        yield [row[i] for i in indices]
 
 
 class Account:
@@ -28,9 +166,14 @@ class Account:
             account_number(int):- Account Number
             full_name(str):- Full name of account holder
         """
+        self._ledger_fh = None
         self.account_number = account_number
         self.full_name = full_name
         self.path = os.path.join(os.getcwd(), full_name.replace(" ", ""))
+        self._balance = 0.0
+
+        os.makedirs(self.path, exist_ok=True)
+        self._ledger_fh = _open_ledger(self.path + "/ledger.csv")
 
         date = datetime.datetime.strftime(datetime.date.today(), "%Y-%m-%d")
 
@@ -41,6 +184,7 @@ class Account:
             "Initial amount credited",
             "UPI",
         )
+        self.commit()
 
     def previous_balance(self, filename):
         """
@@ -52,11 +196,28 @@ class Account:
         Return
             Latest amount in file.
         """
-        with open(filename, "r", encoding="utf-8") as f:
-            csvreader = csv.DictReader(f)
-            data = list(csvreader)
+        self.commit()
 
-        return float(data[-1]["amount"])
+        with open(filename, "rb") as f:
+            header = next(csv.reader([f.readline().decode("utf-8")]))
+
+            # Read backwards from the end until the last record is complete.
+            position = f.seek(0, os.SEEK_END)
+            tail = b""
+            record = None
+            while record is None and position > 0:
+                step = min(4096, position)
+                position -= step
+                f.seek(position)
+                tail = f.read(step) + tail
+                record = _last_record(tail)
+
+        if record is None:
+            record = tail
+
+        last_row = next(csv.reader(io.StringIO(record.decode("utf-8"), newline="")))
+
+        return float(last_row[header.index("amount")])
 
     def credit_amount(self, amount):
         """
@@ -68,8 +229,7 @@ class Account:
         Return
             Total balance.
         """
-        balance = amount + self.previous_balance(self.path + "/ledger.csv")
-        return balance
+        return self._balance + amount
 
     def debit(self, amount):
         """
@@ -81,8 +241,7 @@ class Account:
         Return
             Remaining balance.
         """
-        balance = self.previous_balance(self.path + "/ledger.csv") - amount
-        return balance
+        return self._balance - amount
 
     def transaction(self, amount, category, desc, mode_of_payment, credit=False):
         """
@@ -119,25 +278,48 @@ class Account:
             category(str) :- Category.
             desc(str) :- Description of transaction.
             mode_of_payment(str) :- Mode of payment.
+
+        The amount is stored as given, callers round it to two decimals.
         """
-        data = {
-            "date": date,
-            "category": category,
-            "desc": desc,
-            "mode_of_payment": mode_of_payment,
-            "amount": round(amount),
-        }
+        self._get_ledger_file().write(
+            _ledger_line(date, category, desc, mode_of_payment, amount)
+        )
+        self._balance = amount
 
-        if not os.path.exists(self.path):
-            os.mkdir(self.path)
+    def commit(self):
+        """
+        Flush buffered transaction records to the ledger file.
+
+        Records are kept in a write buffer until commit() or close(). Call
+        it before anything else appends to the same ledger.csv, such as
+        generate_random_data(), so the records stay in order.
+        """
+        if self._ledger_fh is not None:
+            self._ledger_fh.flush()
+
+    def close(self):
+        """
+        Flush and close the ledger file.
+        """
+        if self._ledger_fh is not None:
+            self._ledger_fh.close()
+            self._ledger_fh = None
 
-        with open(self.path + "/ledger.csv", "a", encoding="utf-8") as ledger_file:
-            csvwriter = csv.DictWriter(ledger_file, fieldnames=data.keys())
-            if ledger_file.tell() == 0:
-                csvwriter.writeheader()
-            csvwriter.writerow(data)
+    def __del__(self):
+        """
+        Close the ledger file when the account is garbage collected.
+        """
+        self.close()
+
+    def _get_ledger_file(self):
+        """
+        Return the ledger file, reopening it if it was closed.
+        """
+        if self._ledger_fh is None:
+            self._ledger_fh = _open_ledger(self.path + "/ledger.csv")
+        return self._ledger_fh
 
-    def generate_csv_file(self, in_file, out_file, *keys):
+    def generate_csv_file(self, in_file, out_file, *keys, rows=None):
         """
         Generate csv file with name in out_file with given keys
         from in_file.
@@ -146,22 +328,30 @@ class Account:
             in_file(str) :- Name of input file.
             out_file(str) :- Name of output file.
             keys(list) :- List of keys.
+            rows(iterable) :- Rows of in_file already read, header first.
         """
-        with open(in_file, "r", encoding="utf-8") as f:
-            csvreader = csv.DictReader(f)
-            data = list(csvreader)
-
-        data2 = [{key: entry[key] for key in keys} for entry in data]
-
-        with open(out_file, "w", encoding="utf-8") as f:
-            csvwriter = csv.DictWriter(f, fieldnames=data2[0].keys())
-            csvwriter.writeheader()
-            csvwriter.writerows(data2)
-
-    def generate_category_report(self):
+        if rows is None:
+            self.commit()
+
+            # Open in_file first so a missing input leaves out_file untouched.
+            with open(
+                in_file, "r", encoding="utf-8", newline="", buffering=BUFFER_SIZE
+            ) as fi:
+                self.generate_csv_file(in_file, out_file, *keys, rows=csv.reader(fi))
+            return
+
+        with open(
+            out_file, "w", encoding="utf-8", newline="", buffering=BUFFER_SIZE
+        ) as fo:
+            csv.writer(fo).writerows(_select_columns(rows, keys))
+
+    def generate_category_report(self, rows=None):
         """
         Generate category csv file.
 
+        Args:-
+            rows(list) :- Rows of ledger file already read, header first.
+
         Return
             Name of generated file.
         """
@@ -172,14 +362,18 @@ class Account:
             "category",
             "desc",
             "amount",
+            rows=rows,
         )
 
         return "category.csv"
 
-    def generate_payment_report(self):
+    def generate_payment_report(self, rows=None):
         """
         Generate payment csv file.
 
+        Args:-
+            rows(list) :- Rows of ledger file already read, header first.
+
         Return
             Name of generated file.
         """
@@ -190,164 +384,159 @@ class Account:
             "mode_of_payment",
             "desc",
             "amount",
+            rows=rows,
         )
 
         return "payment.csv"
 
-    def print_report(self):
+    def print_report(self, rows=None):
         """
         Print the information and generate txt and html file.
+
+        Args:-
+            rows(list) :- Rows of ledger file already read, header first.
         """
-        with open(self.path + "/ledger.csv", "r", encoding="utf-8") as ledger_file:
-            csvreader = csv.DictReader(ledger_file)
-            data = list(csvreader)
-
-        categories = {entry["category"] for entry in data}
-        years = sorted(
-            list(
-                {
-                    datetime.datetime.strptime(entry["date"], "%Y-%m-%d").year
-                    for entry in data
-                }
-            )
-        )
+        totals = _sum_amounts(rows if rows is not None else self._iter_ledger())
+        categories = sorted({category for category, _ in totals})
+        years = sorted({month // 12 for _, month in totals})
 
-        categorized_data = []
         today = datetime.date.today()
-
-        for category in categories:
-            category_data = []
-            for year in years:
-                month_end = 13
-                if year == today.year:
-                    month_end = today.month + 1
-                for month in range(1, month_end):
-                    amount = 0
-                    for entry in data:
-                        date_obj = datetime.datetime.strptime(entry["date"], "%Y-%m-%d")
-                        amount += (
-                            float(entry["amount"])
-                            if (
-                                entry["category"] == category
-                                and date_obj.month == month
-                                and date_obj.year == year
-                            )
-                            else 0
-                        )
-                    category_data.append(round(amount, 2))
-            categorized_data.append(category_data)
-
-        print(f"{'Category':10}", end="")
-        txt = f"{'Category':10}"
-        html = "<table><tr><th>Category</th>"
-
-        for year in years:
-            month_end = 13
-            if year == today.year:
-                month_end = today.month + 1
-            for month in range(1, month_end):
-                date = str(month) + "-" + str(year)
-                print(f"{date:>12}", end="")
-                txt += f"{date:>12}"
-                html += f"<th>{date}</th>"
-
-        txt += "\n"
-        html += "</tr>"
-
-        print()
+        ym_pairs = [
+            (year, month)
+            for year in years
+            for month in range(1, today.month + 1 if year == today.year else 13)
+        ]
+        labels = [f"{month}-{year}" for year, month in ym_pairs]
+        month_numbers = [year * 12 + month - 1 for year, month in ym_pairs]
+
+        categorized_data = [
+            [round(totals.get((category, month), 0), 2) for month in month_numbers]
+            for category in categories
+        ]
+
+        txt_parts = [f"{'Category':10}"]
+        txt_parts.extend(f"{label:>12}" for label in labels)
+        txt_parts.append("\n")
 
         for index, category in enumerate(categories):
-            print(f"{category:10}", end="")
-            txt += f"{category:10}"
-            html += f"<tr><td>{category}</td>"
+            txt_parts.append(f"{category:10}")
             for data in categorized_data[index]:
-                print(f"{data:12}", end="")
-                txt += f"{data:12}"
-                html += f"<td>{data}</td>"
-            txt += "\n"
-            html += "</tr>"
-            print()
-
-        html += "</table>"
+                txt_parts.append(f"{data:12}")
+            txt_parts.append("\n")
+
+        txt = "".join(txt_parts)
+        sys.stdout.write(txt)
+
+        def html_rows():
+            yield "<table><tr><th>Category</th>"
+            yield "".join(f"<th>{label}</th>" for label in labels)
+            yield "</tr>"
+            for category, category_data in zip(categories, categorized_data):
+                yield (
+                    f"<tr><td>{category}</td>"
+                    + "".join(f"<td>{data}</td>" for data in category_data)
+                    + "</tr>"
+                )
+            yield "</table>"
 
         self.generate_txt_file(txt)
-        self.generate_html_file(html)
+        self.generate_html_file(html_rows())
+
+    def read_ledger(self):
+        """
+        Read all rows of ledger file, to be shared by several reports.
+
+        Return
+            Rows of ledger file, header first.
+        """
+        return list(self._iter_ledger())
+
+    def _iter_ledger(self):
+        """
+        Iterate over the rows of ledger file without keeping them.
+
+        Yield
+            Rows of ledger file, header first.
+        """
+        self.commit()
+
+        with open(
+            self.path + "/ledger.csv",
+            "r",
+            encoding="utf-8",
+            newline="",
+            buffering=BUFFER_SIZE,
+        ) as ledger_file:
+            yield from csv.reader(ledger_file)
 
     def generate_txt_file(self, output):
         """
         Generate txt file for report.
         """
-        with open(self.path + "/report.txt", "w", encoding="utf-8") as txt:
+        with open(
+            self.path + "/report.txt", "w", encoding="utf-8", buffering=BUFFER_SIZE
+        ) as txt:
             txt.write(output)
 
     def generate_html_file(self, output):
         """
         Generate html file for report.
-        """
-        style = """
-        table, th, td{
-        margin: auto;
-        padding: 5px;
-        border: 2px solid black;
-        border-collapse: collapse;
-        }
-    """
 
-        html = f"""
-        <html>
-        <head>
-        <style>
-            {style}
-        </style>
-        </head>
-        <body>
-        {output}
-        </body>
-        </html>
-    """
+        Args:-
+            output(str or iterable) :- Html body, or its parts in order.
+        """
+        if isinstance(output, str):
+            output = [output]
 
-        with open(self.path + "/report.html", "w", encoding="utf-8") as html_file:
-            html_file.write(html)
+        with open(
+            self.path + "/report.html", "w", encoding="utf-8", buffering=BUFFER_SIZE
+        ) as html_file:
+            html_file.write(HTML_HEAD)
+            html_file.writelines(output)
+            html_file.write(HTML_TAIL)
 
 
 def generate_random_data(n, folder):
     """
     Generate random data for ledger.csv file.
+
+    Commit any Account writing to the same folder first, otherwise its
+    buffered records land after the generated ones.
     """
     categories = ["Food", "Rent", "Credit", "Debit", "Fare", "Picnic"]
     mode_of_payment = ["Net Banking", "Mobile Banking", "UPI", "Card Payment"]
 
-    ledger_data = []
-
     current_year = datetime.date.today().year
 
-    for year in range(current_year - n, current_year):
-        for month in range(1, 13):
-            for category in categories:
-                date = random.randint(1, 28)
-                ledger_data.append(
-                    {
-                        "date": f"{year}-{month}-{date}",
-                        "category": category,
-                        "desc": f"Added {category}",
-                        "mode_of_payment": random.choice(mode_of_payment),
-                        "amount": round(random.random() * 10000, 2),
-                    }
-                )
+    slots = [
+        (year, month, category)
+        for year in range(current_year - n, current_year)
+        for month in range(1, 13)
+        for category in categories
+    ]
+
+    days = random.choices(range(1, 29), k=len(slots))
+    modes = random.choices(mode_of_payment, k=len(slots))
+    amounts = [round(random.random() * 10000, 2) for _ in slots]
 
-    if not os.path.exists(folder):
-        os.mkdir(folder)
+    os.makedirs(folder, exist_ok=True)
 
-    with open(folder + "/ledger.csv", "a", encoding="utf-8") as ledger_file:
-        csvwriter = csv.DictWriter(ledger_file, fieldnames=ledger_data[0].keys())
-        if ledger_file.tell() == 0:
-            csvwriter.writeheader()
-        csvwriter.writerows(ledger_data)
+    with _open_ledger(folder + "/ledger.csv") as ledger_file:
+        ledger_file.writelines(
+            _ledger_line(
+                f"{year}-{month}-{day}", category, f"Added {category}", mode, amount
+            )
+            for (year, month, category), day, mode, amount in zip(
+                slots, days, modes, amounts
+            )
+        )
 
 
 if __name__ == "__main__":
     account = Account("111222", "John Mitchell", 2000)
     generate_random_data(2, "JohnMitchell")
-    account.print_report()
-    print(account.generate_category_report())
-    print(account.generate_payment_report())
+    ledger_rows = account.read_ledger()
+    account.print_report(ledger_rows)
+    print(account.generate_category_report(ledger_rows))
+    print(account.generate_payment_report(ledger_rows))
+    account.close()